@@ -1,11 +1,16 @@
+import os
 import time
 import win32api
 import win32con
 import threading
 import cv2
 import dlib
-from collections import deque
-from scipy.spatial import distance as dist
+import numpy as np
+from numba import njit
+
+# Let OpenCV (cvtColor, resize) parallelize across cores, keeping one
+# free for the capture/log threads
+cv2.setNumThreads(max(1, os.cpu_count() - 1))
 
 # ----------------------
 # Configuration
@@ -15,6 +20,12 @@ LOG_FILE = auto_log_name + "_log.txt"
 
 # Blink detection parameters
 EAR_THRESHOLD = 0.25         # Eye Aspect Ratio threshold
+FRAME_INTERVAL = 0.05        # Target time budget per loop iteration (20 FPS)
+DETECT_SCALE = 0.5           # Run the face detector on a half-size frame
+DETECT_EVERY = 5             # Re-run the face detector every N frames
+REDETECT_MARGIN = 20         # Re-detect if landmarks drift this far outside the cached box
+LOG_BUFFER_SIZE = 65536      # 64 KB write buffer for the log file
+LOG_FLUSH_INTERVAL = 1.0     # Flush the log buffer at most once per second
 SMOOTHING_WINDOW = 5         # Number of frames used for moving-average
 MIN_CLOSE_DURATION = 0.10    # Only count blink if eyes stayed closed at least X seconds
                             # Set to 0 to disable this feature.
@@ -23,11 +34,15 @@ MIN_CLOSE_DURATION = 0.10    # Only count blink if eyes stayed closed at least X
 #   0 = open
 #   1 = closed
 blink_state = 0
-close_start_time = None
+close_start_time = -1.0      # -1.0 means "eyes not currently closed"
 blink_count = 0
 
-# Rolling buffer for smoothing
-ear_buffer = deque(maxlen=SMOOTHING_WINDOW)
+# Ring buffer for smoothing (a plain ndarray the numba kernel can own),
+# with a running sum so the average is O(1)
+ear_buffer = np.zeros(SMOOTHING_WINDOW, dtype=np.float64)
+ear_sum = 0.0
+ear_idx = 0
+ear_len = 0
 
 # Face detector and landmark predictor
 detector = dlib.get_frontal_face_detector()
@@ -52,30 +67,158 @@ key_map = {
     0x34: "4",
 }
 
+class ThreadedCapture:
+    """
+    Runs cv2.VideoCapture.read() on a background daemon thread so the
+    main loop never blocks on camera I/O; read() returns the latest frame.
+    """
+    def __init__(self, src=0):
+        self.cap = cv2.VideoCapture(src)
+        # MJPG at 640x480 cuts USB bandwidth versus raw YUYV and keeps
+        # the decode cheap (the BGR frame is still needed for the overlay)
+        self.cap.set(cv2.CAP_PROP_FOURCC, cv2.VideoWriter_fourcc(*'MJPG'))
+        self.cap.set(cv2.CAP_PROP_FRAME_WIDTH, 640)
+        self.cap.set(cv2.CAP_PROP_FRAME_HEIGHT, 480)
+        self.ret, self.frame = self.cap.read()
+        self.lock = threading.Lock()
+        self.running = False
+        self.thread = None
+
+    def start(self):
+        self.running = True
+        self.thread = threading.Thread(target=self._update, daemon=True)
+        self.thread.start()
+        return self
+
+    def _update(self):
+        while self.running:
+            ret, frame = self.cap.read()
+            with self.lock:
+                self.ret, self.frame = ret, frame
+
+    def read(self):
+        with self.lock:
+            frame = self.frame.copy() if self.frame is not None else None
+            return self.ret, frame
+
+    def stop(self):
+        self.running = False
+        if self.thread is not None:
+            self.thread.join()
+
+    def release(self):
+        self.stop()
+        self.cap.release()
+
+def shape_to_np(shape, start=36, end=48):
+    """
+    Copy landmark points [start, end) from a dlib shape into a
+    (end-start, 2) float array, filling a preallocated buffer instead
+    of building intermediate tuples.
+    """
+    out = np.empty((end - start, 2), dtype=np.float64)
+    for i in range(start, end):
+        p = shape.part(i)
+        out[i - start, 0] = p.x
+        out[i - start, 1] = p.y
+    return out
+
+@njit(cache=True)
 def calculate_ear(eye):
     """
     Compute the Eye Aspect Ratio (EAR) for a given eye.
-    eye: list of (x, y) points corresponding to the eye landmarks
+    eye: (6, 2) ndarray of the eye landmark coordinates
     """
-    A = dist.euclidean(eye[1], eye[5])
-    B = dist.euclidean(eye[2], eye[4])
-    C = dist.euclidean(eye[0], eye[3])
+    # Three distances (p1-p5, p2-p4, p0-p3), written scalar-style so
+    # LLVM compiles them to straight-line native code
+    ax = eye[1, 0] - eye[5, 0]
+    ay = eye[1, 1] - eye[5, 1]
+    bx = eye[2, 0] - eye[4, 0]
+    by = eye[2, 1] - eye[4, 1]
+    cx = eye[0, 0] - eye[3, 0]
+    cy = eye[0, 1] - eye[3, 1]
+    A = (ax * ax + ay * ay) ** 0.5
+    B = (bx * bx + by * by) ** 0.5
+    C = (cx * cx + cy * cy) ** 0.5
     ear = (A + B) / (2.0 * C)
     return ear
 
+@njit(cache=True)
+def update_blink(left_eye, right_eye, ear_buf, ear_sum, ear_idx, ear_len,
+                 state, close_start, now, threshold, min_duration):
+    """
+    JIT-compiled blink kernel: averages the two EARs, updates the
+    ring-buffer running sum and advances the open/closed state machine.
+    close_start uses -1.0 as the "not closed" sentinel. Returns
+    (state, close_start, blink_inc, ear_sum, ear_idx, ear_len, smoothed_ear).
+    """
+    avg_ear = (calculate_ear(left_eye) + calculate_ear(right_eye)) / 2.0
+
+    # Ring-buffer running sum: evict the slot we're about to overwrite
+    if ear_len == ear_buf.shape[0]:
+        ear_sum -= ear_buf[ear_idx]
+    else:
+        ear_len += 1
+    ear_buf[ear_idx] = avg_ear
+    ear_sum += avg_ear
+    ear_idx = (ear_idx + 1) % ear_buf.shape[0]
+    smoothed_ear = ear_sum / ear_len
+
+    # Rise-and-fall logic
+    blink_inc = 0
+    if smoothed_ear < threshold and state == 0:
+        # Eyes just closed
+        state = 1
+        close_start = now
+    elif smoothed_ear > threshold and state == 1:
+        # Eyes just opened; only count it if they stayed closed long enough
+        state = 0
+        if close_start >= 0.0 and now - close_start >= min_duration:
+            blink_inc = 1
+        close_start = -1.0
+
+    return state, close_start, blink_inc, ear_sum, ear_idx, ear_len, smoothed_ear
+
 def track_actions():
-    global blink_state, close_start_time, blink_count
+    global blink_state, close_start_time, blink_count, ear_sum, ear_idx, ear_len
 
-    cap = cv2.VideoCapture(0)
+    cap = ThreadedCapture(0)
+    cap.start()
 
-    with open(LOG_FILE, "a") as log_file:
+    # Buffered log file: instead of flushing every frame (~20 syscalls/sec),
+    # let the 64 KB buffer absorb writes and flush on a timer.
+    with open(LOG_FILE, "a", buffering=LOG_BUFFER_SIZE) as log_file:
+        last_flush = time.monotonic()
+        frame_idx = 0
+        last_face = None
+        last_ts_sec = 0
+        cached_ts = ""
         while True:
+            t0 = time.monotonic()
+
             ret, frame = cap.read()
             if not ret:
                 break
 
             gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
-            faces = detector(gray)
+
+            # The face barely moves between 50 ms frames, so only re-run the
+            # HOG detector every DETECT_EVERY frames (on a downscaled frame,
+            # since HOG cost scales with pixel count) and reuse the cached
+            # rectangle in between; the landmark predictor runs every frame.
+            if last_face is None or frame_idx % DETECT_EVERY == 0:
+                small = cv2.resize(gray, (0, 0), fx=DETECT_SCALE, fy=DETECT_SCALE)
+                detections = detector(small, 0)
+                if detections:
+                    d = detections[0]
+                    last_face = dlib.rectangle(int(d.left() / DETECT_SCALE),
+                                               int(d.top() / DETECT_SCALE),
+                                               int(d.right() / DETECT_SCALE),
+                                               int(d.bottom() / DETECT_SCALE))
+                else:
+                    last_face = None
+            frame_idx += 1
+            faces = [last_face] if last_face is not None else []
 
             # ----------------------------------------------------------
             # For each detected face, compute EAR and update blink state
@@ -83,40 +226,33 @@ def track_actions():
             for face in faces:
                 landmarks = predictor(gray, face)
 
-                # Extract eye coordinates
-                left_eye = [(landmarks.part(i).x, landmarks.part(i).y) for i in range(36, 42)]
-                right_eye = [(landmarks.part(i).x, landmarks.part(i).y) for i in range(42, 48)]
-
-                # Calculate EAR for both eyes, then average
-                left_ear = calculate_ear(left_eye)
-                right_ear = calculate_ear(right_eye)
-                avg_ear = (left_ear + right_ear) / 2.0
-
-                # Smooth the EAR using a rolling average
-                ear_buffer.append(avg_ear)
-                smoothed_ear = sum(ear_buffer) / len(ear_buffer)
-
-                # -----------------------
-                # Rise-and-Fall Logic
-                # -----------------------
-                if smoothed_ear < EAR_THRESHOLD and blink_state == 0:
-                    # Eyes just closed
-                    blink_state = 1
-                    close_start_time = time.time()
-
-                elif smoothed_ear > EAR_THRESHOLD and blink_state == 1:
-                    # Eyes just opened
-                    blink_state = 0
-                    if close_start_time is not None:
-                        close_duration = time.time() - close_start_time
-                        # Only count it as a blink if it stayed closed long enough
-                        if close_duration >= MIN_CLOSE_DURATION:
-                            blink_count += 1
-                    close_start_time = None
+                # Extract both eyes' coordinates as a single (12, 2) array
+                eye_points = shape_to_np(landmarks)
+                left_eye = eye_points[:6]
+                right_eye = eye_points[6:]
+
+                # If the landmarks drift outside the cached rectangle,
+                # drop the cache so the next iteration re-detects
+                xs = eye_points[:, 0]
+                ys = eye_points[:, 1]
+                if (xs.min() < face.left() - REDETECT_MARGIN
+                        or xs.max() > face.right() + REDETECT_MARGIN
+                        or ys.min() < face.top() - REDETECT_MARGIN
+                        or ys.max() > face.bottom() + REDETECT_MARGIN):
+                    last_face = None
+
+                # EAR, smoothing and the rise-and-fall state machine all
+                # run inside the JIT-compiled kernel
+                (blink_state, close_start_time, blink_inc,
+                 ear_sum, ear_idx, ear_len, smoothed_ear) = update_blink(
+                    left_eye, right_eye, ear_buffer, ear_sum, ear_idx, ear_len,
+                    blink_state, close_start_time, time.time(),
+                    EAR_THRESHOLD, MIN_CLOSE_DURATION)
+                blink_count += blink_inc
 
                 # Visualize the eyes and blink count
-                for (x, y) in left_eye + right_eye:
-                    cv2.circle(frame, (x, y), 2, (255, 0, 0), -1)
+                for (x, y) in eye_points:
+                    cv2.circle(frame, (int(x), int(y)), 2, (255, 0, 0), -1)
                 cv2.putText(frame, f"Blink Count: {blink_count}", (10, 30),
                             cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
 
@@ -125,22 +261,37 @@ def track_actions():
             # --------------
             action = "None"
             coords = win32api.GetCursorPos()
-            timestamp = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime())
+
+            # The timestamp only changes once a second, so reformat only then
+            now_sec = int(time.time())
+            if now_sec != last_ts_sec:
+                cached_ts = time.strftime("%Y-%m-%d %H:%M:%S", time.localtime(now_sec))
+                last_ts_sec = now_sec
+            timestamp = cached_ts
+
+            # One GetKeyboardState call fetches all 256 key states at once,
+            # instead of one GetKeyState syscall per tracked key.
+            # Bit 7 of each entry means the key is down.
+            key_state = win32api.GetKeyboardState()
 
             # Mouse clicks
-            if win32api.GetKeyState(win32con.VK_LBUTTON) < 0:
+            if key_state[win32con.VK_LBUTTON] & 0x80:
                 action = "Left Click"
-            elif win32api.GetKeyState(win32con.VK_RBUTTON) < 0:
+            elif key_state[win32con.VK_RBUTTON] & 0x80:
                 action = "Right Click"
             else:
                 # Keyboard actions
                 for vk, name in key_map.items():
-                    if win32api.GetKeyState(vk) < 0:
+                    if key_state[vk] & 0x80:
                         action = name
 
-            # Write to log
-            log_file.write(f"{timestamp} - {coords} - {action} - {blink_count}\n")
-            log_file.flush()
+            # Write to log, tab-delimited so pandas can parse it with the
+            # C engine (flushed periodically; the with-block flushes on exit)
+            log_file.write(f"{timestamp}\t{coords}\t{action}\t{blink_count}\n")
+            now = time.monotonic()
+            if now - last_flush >= LOG_FLUSH_INTERVAL:
+                log_file.flush()
+                last_flush = now
 
             # Show the frame
             cv2.imshow("Blink Detection", frame)
@@ -149,8 +300,11 @@ def track_actions():
             if cv2.waitKey(1) & 0xFF == ord('q'):
                 break
 
-            # Slightly reduce sleep for better frame rate, so we don't miss quick blinks
-            time.sleep(0.05)
+            # Pace to FRAME_INTERVAL: only sleep off whatever time the frame
+            # didn't already spend, so slow frames aren't penalized further
+            dt = FRAME_INTERVAL - (time.monotonic() - t0)
+            if dt > 0:
+                time.sleep(dt)
 
     cap.release()
     cv2.destroyAllWindows()
@@ -1,6 +1,10 @@
+import os
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive: render straight to PNG, no GUI event loop
 import matplotlib.pyplot as plt
 import seaborn as sns
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 def load_controller_log(file_path):
@@ -9,21 +13,45 @@ def load_controller_log(file_path):
     and returns it as a pandas DataFrame.
     """
     # The data format for each line:
-    # [timestamp] - (l3_x, l3_y) - (r3_x, r3_y) - action - blink_count
-    data = pd.read_csv(file_path, sep=" - ", header=None,
-                       names=["timestamp", "l3_coords", "r3_coords", "action", "eyeblink_count"],
-                       engine='python')
+    # [timestamp] <tab> (l3_x, l3_y) <tab> (r3_x, r3_y) <tab> action <tab> blink_count
+    # New logs are tab-delimited so the fast C parser applies; fall back
+    # to the old " - " format (python engine) for older logs
+    with open(file_path) as f:
+        first_line = f.readline()
+    if "\t" in first_line:
+        data = pd.read_csv(file_path, sep="\t", header=None,
+                           names=["timestamp", "l3_coords", "r3_coords", "action", "eyeblink_count"],
+                           engine='c')
+    else:
+        data = pd.read_csv(file_path, sep=" - ", header=None,
+                           names=["timestamp", "l3_coords", "r3_coords", "action", "eyeblink_count"],
+                           engine='python')
 
     # Remove square brackets around timestamp and convert to datetime
     data["timestamp"] = data["timestamp"].str.strip("[]")
     data["timestamp"] = pd.to_datetime(data["timestamp"])
 
-    # Extract float values for l3 and r3 coordinates
-    data[['l3_x', 'l3_y']] = data['l3_coords'].str.extract(r'\(([^,]+),\s*([^)]+)\)').astype(float)
-    data[['r3_x', 'r3_y']] = data['r3_coords'].str.extract(r'\(([^,]+),\s*([^)]+)\)').astype(float)
+    # Extract float values for l3 and r3 coordinates with C-level
+    # strip + split instead of the regex engine
+    for coords_col, x_col, y_col in [('l3_coords', 'l3_x', 'l3_y'),
+                                     ('r3_coords', 'r3_x', 'r3_y')]:
+        split = data[coords_col].str.strip('()').str.split(',', expand=True)
+        # float32 is more than enough for 2-decimal stick values
+        data[x_col] = pd.to_numeric(split[0], errors='coerce').astype('float32')
+        data[y_col] = pd.to_numeric(split[1], errors='coerce').astype('float32')
 
-    # Ensure eyeblink_count is integer
-    data["eyeblink_count"] = data["eyeblink_count"].astype(int)
+    # The raw string columns are fully parsed now; drop them to free memory
+    data = data.drop(columns=['l3_coords', 'r3_coords'])
+
+    # Ensure eyeblink_count is integer (int32 is plenty for blink counts)
+    data["eyeblink_count"] = data["eyeblink_count"].astype('int32')
+
+    # Few distinct actions repeated many times: Categorical makes the
+    # groupby/value_counts/get_dummies in the plots work on int codes
+    data['action'] = data['action'].astype('category')
+
+    # Seconds between consecutive rows, computed once for the plots
+    data['time_diff'] = data['timestamp'].diff().dt.total_seconds().astype('float32')
 
     return data
 
@@ -35,7 +63,8 @@ def plot_controller_eyeblink_over_time(data):
     plt.ylabel("Eyeblink Count")
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    plt.savefig("controller_eyeblink_over_time.png", dpi=100)
+    plt.close()
 
 def plot_controller_most_frequent_actions(data):
     action_counts = data['action'].value_counts().sort_values(ascending=False)
@@ -45,10 +74,10 @@ def plot_controller_most_frequent_actions(data):
     plt.xlabel("Action")
     plt.ylabel("Frequency")
     plt.tight_layout()
-    plt.show()
+    plt.savefig("controller_most_frequent_actions.png", dpi=100)
+    plt.close()
 
 def plot_controller_action_duration(data):
-    data['time_diff'] = data['timestamp'].diff().dt.total_seconds()
     action_durations = data.groupby('action')['time_diff'].mean().sort_values(ascending=False)
     plt.figure(figsize=(10, 6))
     action_durations.plot(kind='bar')
@@ -56,7 +85,8 @@ def plot_controller_action_duration(data):
     plt.xlabel("Action")
     plt.ylabel("Average Duration (seconds)")
     plt.tight_layout()
-    plt.show()
+    plt.savefig("controller_action_duration.png", dpi=100)
+    plt.close()
 
 def plot_controller_action_vs_eyeblink_count(data):
     plt.figure(figsize=(10, 6))
@@ -66,7 +96,8 @@ def plot_controller_action_vs_eyeblink_count(data):
     plt.ylabel("Eyeblink Count")
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    plt.savefig("controller_action_vs_eyeblink_count.png", dpi=100)
+    plt.close()
 
 def controller_action_eyeblink_correlation(data):
     action_dummies = pd.get_dummies(data['action'])
@@ -94,9 +125,10 @@ def plot_thumbstick_distributions(data):
     axes[1].set_title("Right Thumbstick Distribution")
     axes[1].set_xlabel("R3 X")
     axes[1].set_ylabel("R3 Y")
-    
+
     plt.tight_layout()
-    plt.show()
+    plt.savefig("thumbstick_distributions.png", dpi=100)
+    plt.close()
 
 
 def plot_thumbstick_heatmap(data):
@@ -104,35 +136,47 @@ def plot_thumbstick_heatmap(data):
     2D histogram (or hexbin) of left stick or right stick usage.
     """
     plt.figure(figsize=(10, 6))
-    plt.hexbin(data['l3_x'], data['l3_y'], gridsize=30, cmap='Blues')
+    # mincnt skips rendering empty cells; log bins keep hotspots readable
+    plt.hexbin(data['l3_x'], data['l3_y'], gridsize=30, cmap='Blues',
+               mincnt=1, bins='log')
     plt.colorbar(label="Frequency")
     plt.title("Left Thumbstick Heatmap")
     plt.xlabel("L3 X")
     plt.ylabel("L3 Y")
     plt.tight_layout()
-    plt.show()
+    plt.savefig("left_thumbstick_heatmap.png", dpi=100)
+    plt.close()
 
     plt.figure(figsize=(10, 6))
-    plt.hexbin(data['r3_x'], data['r3_y'], gridsize=30, cmap='Reds')
+    plt.hexbin(data['r3_x'], data['r3_y'], gridsize=30, cmap='Reds',
+               mincnt=1, bins='log')
     plt.colorbar(label="Frequency")
     plt.title("Right Thumbstick Heatmap")
     plt.xlabel("R3 X")
     plt.ylabel("R3 Y")
     plt.tight_layout()
-    plt.show()
+    plt.savefig("right_thumbstick_heatmap.png", dpi=100)
+    plt.close()
 
 
 if __name__ == "__main__":
     controller_file_path = '14-15_23-12_controller_log.txt'
     controller_data = load_controller_log(controller_file_path)
 
-    # Basic Plots
-    plot_controller_eyeblink_over_time(controller_data)
-    plot_controller_most_frequent_actions(controller_data)
-    plot_controller_action_duration(controller_data)
-    plot_controller_action_vs_eyeblink_count(controller_data)
+    # Each figure is independent and renders to its own PNG with Agg,
+    # so fan the plot functions out across worker processes
+    plot_jobs = [
+        plot_controller_eyeblink_over_time,
+        plot_controller_most_frequent_actions,
+        plot_controller_action_duration,
+        plot_controller_action_vs_eyeblink_count,
+        plot_thumbstick_distributions,
+        plot_thumbstick_heatmap,
+    ]
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        futures = [pool.submit(fn, controller_data) for fn in plot_jobs]
+        for future in futures:
+            future.result()
+
+    # Text-only analysis stays on the main process
     controller_action_eyeblink_correlation(controller_data)
-
-    # Additional
-    plot_thumbstick_distributions(controller_data)
-    plot_thumbstick_heatmap(controller_data)
@@ -1,7 +1,11 @@
+import os
 import pandas as pd
+import matplotlib
+matplotlib.use('Agg')  # Non-interactive: render straight to PNG, no GUI event loop
 import matplotlib.pyplot as plt
 import seaborn as sns
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
 
 # ---------------------------------------
@@ -12,15 +16,42 @@ def load_log_data(file_path):
     Loads keyboard/mouse log data from a specified file path
     and returns it as a pandas DataFrame.
     """
-    data = pd.read_csv(file_path, sep=" - ", header=None, 
-                       names=["timestamp", "coords", "action", "eyeblink_count"], 
-                       engine='python')
+    # New logs are tab-delimited so the fast C parser applies; fall back
+    # to the old " - " format (python engine) for older logs
+    with open(file_path) as f:
+        first_line = f.readline()
+    if "\t" in first_line:
+        data = pd.read_csv(file_path, sep="\t", header=None,
+                           names=["timestamp", "coords", "action", "eyeblink_count"],
+                           engine='c')
+    else:
+        data = pd.read_csv(file_path, sep=" - ", header=None,
+                           names=["timestamp", "coords", "action", "eyeblink_count"],
+                           engine='python')
     # Remove the square brackets around the timestamp and convert to datetime
     data["timestamp"] = data["timestamp"].str.strip("[]")
     data["timestamp"] = pd.to_datetime(data["timestamp"])
 
-    # Ensure eyeblink_count is an integer
-    data["eyeblink_count"] = data["eyeblink_count"].astype(int)
+    # Ensure eyeblink_count is an integer (int32 is plenty for blink counts)
+    data["eyeblink_count"] = data["eyeblink_count"].astype('int32')
+
+    # Parse the '(x, y)' coords once here with C-level string ops
+    # (strip + split) rather than a regex in every plot; to_numeric
+    # handles both int and float coordinates
+    split = data['coords'].str.strip('()').str.split(',', expand=True)
+    data['x'] = pd.to_numeric(split[0], errors='coerce').astype('float32')
+    data['y'] = pd.to_numeric(split[1], errors='coerce').astype('float32')
+
+    # The raw string column is fully parsed now; drop it to free memory
+    data = data.drop(columns=['coords'])
+
+    # Few distinct actions repeated many times: Categorical makes the
+    # groupby/value_counts/get_dummies in the plots work on int codes
+    data['action'] = data['action'].astype('category')
+
+    # Seconds between consecutive rows, computed once for every plot
+    # that needs it (float32 halves the column's memory traffic)
+    data['time_diff'] = data['timestamp'].diff().dt.total_seconds().astype('float32')
 
     return data
 
@@ -36,7 +67,8 @@ def plot_eyeblink_count_over_time(data):
     plt.ylabel("Eyeblink Count")
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    plt.savefig("eyeblink_count_over_time.png", dpi=100)
+    plt.close()
 
 
 def plot_most_frequent_actions(data):
@@ -47,19 +79,22 @@ def plot_most_frequent_actions(data):
     plt.xlabel("Action")
     plt.ylabel("Frequency")
     plt.tight_layout()
-    plt.show()
+    plt.savefig("most_frequent_actions.png", dpi=100)
+    plt.close()
 
 
 def plot_action_sequences(data, sequence_length=2):
     """
-    Instead of the naive approach, we can build pairs from consecutive rows.
-    shift(-sequence_length) means we are looking at the next (sequence_length) rows,
-    but we often want just pairs: row i and row i+1. So you can adapt as needed.
+    Builds pairs from consecutive rows: shift(-1) lines each action up
+    with the one that follows it, so row i pairs with row i+1. Extend
+    the shift/cat chain if you need longer sequences.
     """
-    # Example: for sequence_length=2, we'll look at pairs of consecutive actions
-    pairs = list(zip(data['action'][:-1], data['action'][1:]))
-    pair_strings = [f"{a1} -> {a2}" for (a1, a2) in pairs]
-    sequence_counts = pd.Series(pair_strings).value_counts().head(15)  # Top 15
+    # Example: for sequence_length=2, we'll look at pairs of consecutive
+    # actions, built with a vectorized shift + str.cat instead of a
+    # Python-level zip over the rows
+    next_action = data['action'].shift(-1)
+    pair_strings = data['action'].str.cat(next_action, sep=' -> ').dropna()
+    sequence_counts = pair_strings.value_counts().head(15)  # Top 15
     plt.figure(figsize=(10, 6))
     sns.barplot(x=sequence_counts.index, y=sequence_counts.values)
     plt.title(f"Most Frequent {sequence_length}-Action Sequences")
@@ -67,11 +102,11 @@ def plot_action_sequences(data, sequence_length=2):
     plt.ylabel("Frequency")
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    plt.savefig("action_sequences.png", dpi=100)
+    plt.close()
 
 
 def plot_action_duration(data):
-    data['time_diff'] = data['timestamp'].diff().dt.total_seconds()
     action_durations = data.groupby('action')['time_diff'].mean()
     plt.figure(figsize=(10, 6))
     action_durations.plot(kind='bar')
@@ -79,7 +114,8 @@ def plot_action_duration(data):
     plt.xlabel("Action")
     plt.ylabel("Average Duration (seconds)")
     plt.tight_layout()
-    plt.show()
+    plt.savefig("action_duration.png", dpi=100)
+    plt.close()
 
 
 def plot_action_vs_eyeblink_count(data):
@@ -90,23 +126,26 @@ def plot_action_vs_eyeblink_count(data):
     plt.ylabel("Eyeblink Count")
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    plt.savefig("action_vs_eyeblink_count.png", dpi=100)
+    plt.close()
 
 
 def plot_action_heatmap(data):
     """
-    Note: This assumes 'coords' column is in the format 'x, y'.
-    Extract integer or float coordinates, then plot a 2D hexbin.
+    Plots a 2D hexbin of the mouse coordinates
+    (the 'x'/'y' columns parsed in load_log_data).
     """
-    data[['x', 'y']] = data['coords'].str.extract(r'(\d+\.?\d*),\s*(\d+\.?\d*)').astype(float)
     plt.figure(figsize=(10, 6))
-    plt.hexbin(data['x'], data['y'], gridsize=30, cmap='YlGnBu')
+    # mincnt skips rendering empty cells; log bins keep hotspots readable
+    plt.hexbin(data['x'], data['y'], gridsize=30, cmap='YlGnBu',
+               mincnt=1, bins='log')
     plt.colorbar(label="Frequency")
     plt.title("Action Heatmap")
     plt.xlabel("X Coordinate")
     plt.ylabel("Y Coordinate")
     plt.tight_layout()
-    plt.show()
+    plt.savefig("action_heatmap.png", dpi=100)
+    plt.close()
 
 
 def action_eyeblink_correlation(data):
@@ -128,11 +167,11 @@ def plot_action_trends_over_time(data):
     plt.xlabel("Hour of the Day")
     plt.ylabel("Action Frequency")
     plt.tight_layout()
-    plt.show()
+    plt.savefig("action_trends_over_time.png", dpi=100)
+    plt.close()
 
 
 def action_timing_analysis(data):
-    data['time_diff'] = data['timestamp'].diff().dt.total_seconds()
     action_timing = data.groupby('action')['time_diff'].mean()
     print("Average time difference between actions, by Action:")
     print(action_timing)
@@ -145,7 +184,6 @@ def plot_inactivity_periods(data, inactivity_threshold=5.0):
     """
     Identifies and plots periods of inactivity longer than `inactivity_threshold` seconds.
     """
-    data['time_diff'] = data['timestamp'].diff().dt.total_seconds()
     # Mark those periods where time_diff > threshold
     inactivity_periods = data[data['time_diff'] > inactivity_threshold]
     
@@ -157,7 +195,8 @@ def plot_inactivity_periods(data, inactivity_threshold=5.0):
     plt.ylabel("Inactivity Duration (seconds)")
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    plt.savefig("inactivity_periods.png", dpi=100)
+    plt.close()
 
 
 def plot_rolling_eyeblink(data, window_size=10):
@@ -174,25 +213,33 @@ def plot_rolling_eyeblink(data, window_size=10):
     plt.legend()
     plt.xticks(rotation=45)
     plt.tight_layout()
-    plt.show()
+    plt.savefig("rolling_eyeblink.png", dpi=100)
+    plt.close()
 
 
 def build_transition_matrix(data):
     """
     Constructs a transition matrix: the frequency of going from Action i to Action j.
+    Counts directly on the Categorical int codes with one np.add.at pass,
+    instead of building an object-dtype frame for pd.crosstab.
     """
-    actions = data['action']
-    # shift(-1) means next row’s action
-    next_actions = actions.shift(-1)
+    categories = data['action'].cat.categories
+    codes = data['action'].cat.codes.to_numpy()
+    k = len(categories)
 
-    # Create a DataFrame with current and next action
-    transitions = pd.DataFrame({'current': actions, 'next': next_actions}).dropna()
+    # codes[i] -> codes[i+1] are the transitions; code -1 marks a NaN action
+    current = codes[:-1]
+    next_codes = codes[1:]
+    valid = (current >= 0) & (next_codes >= 0)
+
+    transition_counts = np.zeros((k, k), dtype=np.int32)
+    np.add.at(transition_counts, (current[valid], next_codes[valid]), 1)
 
-    # Build a frequency table
-    transition_counts = pd.crosstab(transitions['current'], transitions['next'])
-    
     # Normalize to get probabilities (row-wise)
-    transition_matrix = transition_counts.div(transition_counts.sum(axis=1), axis=0)
+    row_sums = transition_counts.sum(axis=1, keepdims=True)
+    transition_matrix = pd.DataFrame(
+        transition_counts / np.where(row_sums == 0, 1, row_sums),
+        index=categories, columns=categories)
     print("Transition Matrix (row-wise probabilities):")
     print(transition_matrix)
     return transition_matrix
@@ -205,18 +252,25 @@ if __name__ == "__main__":
     log_file_path = '13-48_23-12_log.txt'
     data = load_log_data(log_file_path)
 
-    # Original
-    plot_eyeblink_count_over_time(data)
-    plot_most_frequent_actions(data)
-    plot_action_sequences(data, sequence_length=2)
-    plot_action_duration(data)
-    plot_action_vs_eyeblink_count(data)
-    plot_action_heatmap(data)
+    # Each figure is independent and renders to its own PNG with Agg,
+    # so fan the plot functions out across worker processes
+    plot_jobs = [
+        (plot_eyeblink_count_over_time, {}),
+        (plot_most_frequent_actions, {}),
+        (plot_action_sequences, {'sequence_length': 2}),
+        (plot_action_duration, {}),
+        (plot_action_vs_eyeblink_count, {}),
+        (plot_action_heatmap, {}),
+        (plot_action_trends_over_time, {}),
+        (plot_inactivity_periods, {'inactivity_threshold': 5.0}),
+        (plot_rolling_eyeblink, {'window_size': 10}),
+    ]
+    with ProcessPoolExecutor(max_workers=os.cpu_count()) as pool:
+        futures = [pool.submit(fn, data, **kwargs) for fn, kwargs in plot_jobs]
+        for future in futures:
+            future.result()
+
+    # Text-only analyses stay on the main process so their output reads in order
     action_eyeblink_correlation(data)
-    plot_action_trends_over_time(data)
     action_timing_analysis(data)
-
-    # New additions
-    plot_inactivity_periods(data, inactivity_threshold=5.0)
-    plot_rolling_eyeblink(data, window_size=10)
     tm = build_transition_matrix(data)